@@ -1,326 +1,361 @@
 import dspy
-from sklearn.model_selection import GridSearchCV
-import matplotlib.pyplot as plt
-import seaborn as sns
-import json
 import os
+import json
+import functools
+import hashlib
+import heapq
+from dataclasses import dataclass
+from operator import itemgetter
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from poker_bot.trainer import TrainingConfig, PokerTrainer
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-class HyperparameterTuner:
-    def __init__(self):
-        self.results_dir = os.path.join(os.path.dirname(__file__), 'tuning_results')
-        os.makedirs(self.results_dir, exist_ok=True)
-        
-    def tune_hyperparameters(self, param_grid):
-        """Run real hyperparameter tuning"""
-        from sklearn.model_selection import GridSearchCV
-        
-        # Create parameter combinations
-        param_combinations = [
-            {
-                'learning_rate': lr,
-                'batch_size': bs,
-                'temperature': temp,
-                'num_epochs': ne
-            }
-            for lr in param_grid['learning_rate']
-            for bs in param_grid['batch_size']
-            for temp in param_grid['temperature']
-            for ne in param_grid.get('num_epochs', [5])
-        ]
-        
-        results = {
-            'scores': [],
-            'best_params': None,
-            'best_score': float('-inf')
-        }
-        
-        # Test each combination
-        for params in param_combinations:
-            # Configure model with current parameters
-            dspy.configure(
-                lm='gpt-4',
-                temperature=params['temperature']
-            )
-            
-            # Create fresh model instance
-            from poker_bot.poker_agent import PokerAgent
-            model = PokerAgent()
-            
-            # Train and evaluate
-            train_data, valid_data = self._generate_validation_data()
-            score = self._evaluate_parameters(model, train_data, valid_data, params)
-            
-            results['scores'].append({
-                'params': params,
-                'score': score
-            })
-            
-            # Update best parameters
-            if score > results['best_score']:
-                results['best_score'] = score
-                results['best_params'] = params
-        
-        # Save results
-        results_path = os.path.join(self.results_dir, 'tuning_results.json')
-        with open(results_path, 'w') as f:
-            json.dump(results, f, indent=2)
-        
-        return results
+@functools.lru_cache(maxsize=None)
+def _has_plotting():
+    """Probe the plotting libraries on first use rather than at import time"""
+    try:
+        import matplotlib
+        return True
+    except ImportError:
+        print("Warning: matplotlib not installed. Plotting functionality will be disabled.")
+        return False
 
-    def _generate_validation_data(self):
-        """Generate diverse poker scenarios for validation"""
-        from itertools import product
-        
-        positions = ['BTN', 'CO', 'MP', 'UTG', 'BB', 'SB']
-        stack_sizes = [1000, 2000, 5000]
-        pot_sizes = [100, 200, 500]
-        
-        # Define sample hands that are properly formatted
-        sample_hands = [
-            "AH KH",  # Premium suited
-            "QS QH",  # Pocket pair
-            "JD TC",  # Connected cards
-            "8H 7H",  # Small suited
-            "AS KD"   # Big cards
-        ]
-        
-        scenarios = []
-        
-        for pos, stack, pot in product(positions, stack_sizes, pot_sizes):
-            for hand in sample_hands:
-                scenarios.append({
-                    'hand': hand,
-                    'table_cards': '',
-                    'position': pos,
-                    'pot_size': float(pot),
-                    'stack_size': float(stack),
-                    'opponent_stack': float(stack),
-                    'game_type': 'cash',
-                    'opponent_tendency': 'unknown'
-                })
-            
-            scenarios.append({
-                'hand': '7H 6H',  # Example speculative hand
-                'table_cards': '',
-                'position': pos,
-                'pot_size': pot,
-                'stack_size': stack,
-                'opponent_stack': stack,
-                'game_type': 'cash',
-                'opponent_tendency': 'unknown'
-            })
-        
-        # Split into train/valid
-        split = int(len(scenarios) * 0.8)
-        return scenarios[:split], scenarios[split:]
+@dataclass
+class ScenarioBatch:
+    """Poker scenarios stored as one array per field (struct-of-arrays).
 
-    def _evaluate_parameters(self, model, train_data, valid_data, params):
-        """Evaluate a parameter combination"""
-        try:
-            # Train for specified epochs
-            num_epochs = params.get('num_epochs', 3)
-            for _ in range(num_epochs):
-                for i in range(0, len(train_data), params['batch_size']):
-                    batch = train_data[i:i + params['batch_size']]
-                    # Train on batch
-                    for game in batch:
-                        try:
-                            model(
-                                hand=game['hand'],
-                                table_cards=game['table_cards'],
-                                position=game['position'],
-                                pot_size=float(game['pot_size']),
-                                stack_size=float(game['stack_size']),
-                                opponent_stack=float(game['opponent_stack']),
-                                game_type=game['game_type'],
-                                opponent_tendency=game['opponent_tendency']
-                            )
-                        except Exception as e:
-                            print(f"Error processing game in batch: {str(e)}")
-                            continue
-                            
-            # Evaluate on validation data
-            from poker_bot.trainer import PokerEvaluator
-            evaluator = PokerEvaluator()
-            metrics = evaluator.evaluate(model, valid_data)
-            
-            # Return composite score
-            return (
-                metrics['win_rate'] * 0.4 +
-                metrics['expected_value'] * 0.3 +
-                metrics['decision_quality'] * 0.2 +
-                metrics['bluff_efficiency'] * 0.1
-            )
-        except Exception as e:
-            print(f"Error in parameter evaluation: {str(e)}")
-            return float('-inf')  # Return worst possible score on error
+    Indexing with an int returns one scenario as PokerAgent keyword
+    arguments; indexing with a slice or index array returns a ScenarioBatch.
+    """
+    __slots__ = (
+        'hand', 'table_cards', 'position', 'pot_size', 'stack_size',
+        'opponent_stack', 'game_type', 'opponent_tendency'
+    )
+    hand: np.ndarray
+    table_cards: np.ndarray
+    position: np.ndarray
+    pot_size: np.ndarray
+    stack_size: np.ndarray
+    opponent_stack: np.ndarray
+    game_type: np.ndarray
+    opponent_tendency: np.ndarray
+
+    def __len__(self):
+        return len(self.hand)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return {field: getattr(self, field)[index].item() for field in self.__slots__}
+        return ScenarioBatch(*(getattr(self, field)[index] for field in self.__slots__))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+# Composite score weights, aligned with _METRIC_KEYS
+_METRIC_KEYS = ('win_rate', 'expected_value', 'decision_quality', 'bluff_efficiency')
+_WEIGHTS = np.array([0.4, 0.3, 0.2, 0.1], dtype=np.float32)
+_EV_INDEX = _METRIC_KEYS.index('expected_value')
+
+def _composite_score(metrics, valid_data):
+    """Weighted sum of the evaluator metrics
+
+    Expected value is reported in chips, so it is divided by the mean pot
+    size of valid_data to put it on the same scale as the rate metrics.
+    """
+    values = np.fromiter((metrics[k] for k in _METRIC_KEYS), dtype=np.float32, count=len(_METRIC_KEYS))
+    values[_EV_INDEX] /= valid_data.pot_size.mean()
+    return float(_WEIGHTS @ values)
+
+# Successive halving: fraction (1/N) of candidates kept after each rung, and the
+# smallest validation subset a rung may score candidates on
+_HALVING_FACTOR = 3
+_MIN_VALID_SCENARIOS = 6
+
+def _halving_budgets(n_candidates, n_valid):
+    """Fraction of the train/valid scenarios used per rung
+
+    Like HalvingGridSearchCV's min_resources='exhaust': add rungs while there
+    are candidates left to prune and the first rung still scores on at least
+    _MIN_VALID_SCENARIOS hands, so the last rung always uses the full data.
+    """
+    rungs = 1
+    while (n_candidates >= _HALVING_FACTOR ** rungs
+           and n_valid >= _MIN_VALID_SCENARIOS * _HALVING_FACTOR ** rungs):
+        rungs += 1
+    return [1.0 / _HALVING_FACTOR ** (rungs - 1 - r) for r in range(rungs)]
+
+# Number of leading parameter sets kept in top_params.json
+_TOP_K = 5
+
+# The parameters and the train/valid data are already hashed into the cache key, so this
+# version only tracks code changes: bump it when training or scoring logic changes
+_CACHE_VERSION = 1
+
+def _subsample(batch, fraction):
+    """Fixed subset covering the given fraction of a ScenarioBatch
+
+    Subsets are prefixes of one seeded permutation, so each smaller budget
+    is contained in every larger one.
+    """
+    if fraction >= 1.0:
+        return batch
+    size = max(1, round(len(batch) * fraction))
+    order = np.random.default_rng(0).permutation(len(batch))
+    return batch[np.sort(order[:size])]
+
+def _cache_path(cache_dir, params, train_data, valid_data):
+    """Location of the cached evaluation for a parameter combination on the given data"""
+    digest = hashlib.sha256()
+    payload = json.dumps({'params': params, 'version': _CACHE_VERSION}, sort_keys=True)
+    digest.update(payload.encode())
+    for batch in (train_data, valid_data):
+        for field in ScenarioBatch.__slots__:
+            values = getattr(batch, field)
+            digest.update(f'{field}:{values.dtype.str}:{values.shape}'.encode())
+            digest.update(values.tobytes())
+    key = digest.hexdigest()[:16]
+    return os.path.join(cache_dir, f'{key}.json')
+
+def _write_json(path, obj):
+    """Write obj to path as indented JSON, using orjson when it is installed
+
+    The payload is encoded before the file is opened, so a value that fails
+    to serialize leaves any previous file intact.
+    """
+    if orjson is not None:
+        # Grids built with NumPy (e.g. np.logspace) yield NumPy scalars in params
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(obj, indent=2).encode()
+    with open(path, 'wb') as f:
+        f.write(data)
+
+# Objects reused across evaluations within one worker process
+_worker_state = {}
+
+def _get_worker_state():
+    """Return this process's PokerTrainer and base LM, creating them once"""
+    if not _worker_state:
+        _worker_state['trainer'] = PokerTrainer()
+        # Configure DSPy after PokerTrainer, whose constructor applies its own defaults
+        _worker_state['lm'] = dspy.LM('openai/gpt-4-mini')
+        dspy.configure(lm=_worker_state['lm'])
+    return _worker_state['trainer'], _worker_state['lm']
+
+def _evaluate_one(params, train_data, valid_data, cache_dir):
+    """Train a parameter combination for one epoch and evaluate it.
+
+    Runs inside a joblib worker, so DSPy is configured per process rather
+    than shared with the parent; each combination only scopes a copy of the
+    worker's LM with its own sampling settings. Results are cached in
+    cache_dir so that re-running an overlapping grid only evaluates new
+    combinations. Returns (result, cached), where cached is True when the
+    result came from cache_dir.
+    """
+    cache_path = _cache_path(cache_dir, params, train_data, valid_data)
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r') as f:
+            return json.load(f), True
     
-    def plot_results(self, results):
-        """Generate visualization of tuning results"""
-        plt.figure(figsize=(10, 6))
-        
-        # Plot learning rate vs accuracy
-        plt.subplot(1, 2, 1)
-        sns.lineplot(x=results['learning_rate'], y=results['accuracy'])
-        plt.xlabel('Learning Rate')
-        plt.ylabel('Accuracy')
-        plt.title('Learning Rate Impact')
-        
-        # Plot batch size vs accuracy 
-        plt.subplot(1, 2, 2)
-        sns.lineplot(x=results['batch_size'], y=results['accuracy'])
-        plt.xlabel('Batch Size')
-        plt.ylabel('Accuracy')
-        plt.title('Batch Size Impact')
-        
-        plt.tight_layout()
+    # Update training configuration
+    config = TrainingConfig(
+        learning_rate=params['learning_rate'],
+        batch_size=params['batch_size'],
+        temperature=params['temperature']
+    )
+    
+    # Reuse the worker's trainer, starting from a clean agent and empty response cache
+    trainer, base_lm = _get_worker_state()
+    model = trainer.agent
+    model.reset_parameters()
+    trainer.response_cache = {}
+    trainer.config = config
+    
+    lm = base_lm.copy(
+        temperature=params['temperature'],
+        max_tokens=params['max_tokens']
+    )
+    with dspy.context(lm=lm):
+        # Train model briefly for evaluation
+        trainer.train_one_epoch(train_data)
         
-        # Save plot
-        plot_path = os.path.join(self.results_dir, 'tuning_plot.png')
-        plt.savefig(plot_path)
-        plt.close()
-import os
-import json
-try:
-    import matplotlib.pyplot as plt
-    import seaborn as sns
-    HAS_PLOTTING = True
-except ImportError:
-    HAS_PLOTTING = False
-    print("Warning: matplotlib or seaborn not installed. Plotting functionality will be disabled.")
+        # Evaluate model
+        metrics = trainer.evaluator.evaluate(model, valid_data)
+    score = _composite_score(metrics, valid_data)
+    
+    result = {
+        'params': params,
+        'num_scenarios': len(train_data) + len(valid_data),
+        'metrics': metrics,
+        'score': score
+    }
+    
+    # Write atomically so a concurrent or interrupted run never sees a partial file
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f)
+    os.replace(tmp_path, cache_path)
+    
+    return result, False
 
 class HyperparameterTuner:
     def __init__(self):
         self.results_dir = os.path.join(os.path.dirname(__file__), 'tuning_results')
         os.makedirs(self.results_dir, exist_ok=True)
 
-    def _generate_validation_data(self):
-        """Generate diverse poker scenarios for validation"""
-        from itertools import product
-
-        positions = ['BTN', 'CO', 'MP', 'UTG', 'BB', 'SB']
-        stack_sizes = [1000, 2000, 5000]
-        pot_sizes = [100, 200, 500]
-
-        scenarios = []
-
-        for pos, stack, pot in product(positions, stack_sizes, pot_sizes):
-            scenarios.append({
-                'hand': 'AH KH',  # Example premium hand
-                'table_cards': '',
-                'position': pos,
-                'pot_size': pot,
-                'stack_size': stack,
-                'opponent_stack': stack,
-                'game_type': 'cash',
-                'opponent_tendency': 'unknown'
-            })
-
-            scenarios.append({
-                'hand': '7H 6H',  # Example speculative hand
-                'table_cards': '',
-                'position': pos,
-                'pot_size': pot,
-                'stack_size': stack,
-                'opponent_stack': stack,
-                'game_type': 'cash',
-                'opponent_tendency': 'unknown'
-            })
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _generate_validation_data():
+        """Generate diverse poker scenarios for validation
+
+        The scenarios do not depend on the parameters being tuned, so the
+        split is built once and shared across tuners. Its arrays are made
+        read-only so no caller can corrupt the shared copy.
+        """
+        positions = np.array(['BTN', 'CO', 'MP', 'UTG', 'BB', 'SB'])
+        stack_sizes = np.array([1000, 2000, 5000], dtype=np.float64)
+        pot_sizes = np.array([100, 200, 500], dtype=np.float64)
+        sample_hands = np.array([
+            'AH KH',  # Example premium hand
+            '7H 6H'   # Example speculative hand
+        ])
+
+        # Index every (position, stack, pot, hand) combination, hand varying fastest
+        pos_ix, stack_ix, pot_ix, hand_ix = [
+            a.ravel() for a in np.meshgrid(
+                np.arange(len(positions)), np.arange(len(stack_sizes)),
+                np.arange(len(pot_sizes)), np.arange(len(sample_hands)),
+                indexing='ij'
+            )
+        ]
+
+        num_scenarios = len(hand_ix)
+        scenarios = ScenarioBatch(
+            hand=sample_hands[hand_ix],
+            table_cards=np.full(num_scenarios, ''),
+            position=positions[pos_ix],
+            pot_size=pot_sizes[pot_ix],
+            stack_size=stack_sizes[stack_ix],
+            opponent_stack=stack_sizes[stack_ix],
+            game_type=np.full(num_scenarios, 'cash'),
+            opponent_tendency=np.full(num_scenarios, 'unknown')
+        )
+        for field in ScenarioBatch.__slots__:
+            getattr(scenarios, field).setflags(write=False)
 
         # Split into train/valid
         split = int(len(scenarios) * 0.8)
         return scenarios[:split], scenarios[split:]
 
-    def tune_hyperparameters(self, param_grid):
-        """Run real hyperparameter tuning"""
-        from poker_bot.poker_agent import PokerAgent
-        from poker_bot.trainer import PokerEvaluator
-        from sklearn.model_selection import ParameterGrid
-        from poker_bot.trainer import TrainingConfig, PokerTrainer
-        import json
-        
+    def tune_hyperparameters(self, param_grid, n_iter=None):
+        """Run real hyperparameter tuning
+
+        By default every combination in param_grid is evaluated. When n_iter
+        is given, only n_iter combinations are sampled from the grid instead.
+        Candidates are pruned by successive halving: all are first trained
+        and scored on a fixed subset of the scenarios, and only the top third
+        advance to the next rung, which uses a larger subset. The number of
+        rungs follows from the candidate count and a floor on the validation
+        subset, so small grids are scored on every scenario straight away.
+        """
         train_data, valid_data = self._generate_validation_data()
-        evaluator = PokerEvaluator()
-        results = []
         
-        parameter_list = list(ParameterGrid(param_grid))
+        if n_iter is None:
+            parameter_list = list(ParameterGrid(param_grid))
+        else:
+            parameter_list = list(ParameterSampler(param_grid, n_iter=n_iter, random_state=0))
         
-        for params in parameter_list:
-            # Configure DSPy with current parameters
-            dspy.configure(
-                lm='gpt-4-mini',
-                temperature=params['temperature'],
-                max_tokens=params['max_tokens']
-            )
-            
-            # Update training configuration
-            config = TrainingConfig(
-                learning_rate=params['learning_rate'],
-                batch_size=params['batch_size'],
-                temperature=params['temperature']
-            )
-            
-            # Initialize agent and trainer
-            model = PokerAgent()
-            trainer = PokerTrainer()
-            trainer.agent = model
-            trainer.config = config
-            
-            # Train model briefly for evaluation
-            trainer.train_one_epoch(train_data)
-            
-            # Evaluate model
-            metrics = evaluator.evaluate(model, valid_data)
-            score = metrics['win_rate']  # Use win rate as the main score
-            
-            # Save results
-            results.append({
-                'params': params,
-                'metrics': metrics,
-                'score': score
-            })
+        cache_dir = os.path.join(self.results_dir, 'cache')
+        os.makedirs(cache_dir, exist_ok=True)
         
-        # Identify best parameters
-        best_result = max(results, key=lambda x: x['score'])
+        # Latest (largest-subset) result per combination, keyed by index into parameter_list
+        latest = {}
+        survivors = list(range(len(parameter_list)))
+        
+        # Log this sweep's fresh evaluations as they arrive; cached results were logged by
+        # the run that produced them. Resuming an interrupted sweep is handled by the cache.
+        stream_path = os.path.join(self.results_dir, 'tuning_results.jsonl')
+        with open(stream_path, 'w') as stream, \
+                Parallel(n_jobs=-1, backend="loky", batch_size="auto", return_as="generator") as parallel:
+            for budget in _halving_budgets(len(parameter_list), len(valid_data)):
+                rung_train = _subsample(train_data, budget)
+                rung_valid = _subsample(valid_data, budget)
+                
+                # Combinations are independent, so evaluate them across worker processes
+                scored = parallel(
+                    delayed(_evaluate_one)(parameter_list[i], rung_train, rung_valid, cache_dir)
+                    for i in survivors
+                )
+                for n, (result, cached) in enumerate(scored):
+                    if not cached:
+                        stream.write(json.dumps(result) + '\n')
+                        stream.flush()
+                    latest[survivors[n]] = result
+                
+                # Keep only the strongest candidates for the next rung
+                keep = max(1, len(survivors) // _HALVING_FACTOR)
+                survivors = heapq.nlargest(keep, survivors, key=lambda i: latest[i]['score'])
+        
+        results = [latest[i] for i in range(len(parameter_list))]
+        
+        # Rank by subset size reached first, so only candidates from the final rung compete on score
+        top_results = heapq.nlargest(_TOP_K, results, key=itemgetter('num_scenarios', 'score'))
+        best_result = top_results[0]
         
         final_results = {
             'all_results': results,
+            'top_results': top_results,
             'best_params': best_result['params'],
             'best_score': best_result['score']
         }
         
         # Save all tuning results to folder
         tuning_results_path = os.path.join(self.results_dir, 'tuning_results.json')
-        with open(tuning_results_path, 'w') as f:
-            json.dump(final_results, f, indent=2)
+        _write_json(tuning_results_path, final_results)
         
         # Save best parameters separately
         best_params_path = os.path.join(self.results_dir, 'best_params.json')
-        with open(best_params_path, 'w') as f:
-            json.dump(best_result, f, indent=2)
+        _write_json(best_params_path, best_result)
+        
+        # Save leading parameter sets as fallbacks
+        top_params_path = os.path.join(self.results_dir, 'top_params.json')
+        _write_json(top_params_path, top_results)
         
         print(f"Hyperparameter tuning complete. Best parameters saved to {best_params_path}")
         return final_results
 
     def plot_results(self, results):
         """Plot tuning results"""
-        if not HAS_PLOTTING:
-            print("Cannot create plot: matplotlib or seaborn not installed")
+        if not _has_plotting():
+            print("Cannot create plot: matplotlib not installed")
             return
 
+        # Render off-screen; the plot is only ever written to disk
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+
         try:
             plt.figure(figsize=(10, 6))
             
-            # Extract scores and parameters
-            scores = [r['score'] for r in results['all_results']]
+            # Only final-rung candidates were scored on the same scenarios, so plot just those
+            final_size = max(r['num_scenarios'] for r in results['all_results'])
+            final = [r for r in results['all_results'] if r['num_scenarios'] == final_size]
+            scores = [r['score'] for r in final]
             params = [f"lr={r['params']['learning_rate']}\nb={r['params']['batch_size']}" 
-                     for r in results['all_results']]
+                     for r in final]
             
             # Create bar plot
             plt.bar(range(len(scores)), scores)
             plt.xticks(range(len(scores)), params, rotation=45)
             plt.ylabel('Score')
-            plt.title('Hyperparameter Tuning Results')
+            plt.title(f'Hyperparameter Tuning Results ({final_size} scenarios)')
             
             # Add value labels on top of bars
             for i, score in enumerate(scores):
@@ -36,6 +36,13 @@ class PokerAgent(dspy.Module):
         # Initialize a local model placeholder
         self.local_model = None
 
+    def reset_parameters(self):
+        """Discard learned state so the agent can be reused for a fresh training run"""
+        self.state = {}
+        self.local_model = None
+        self.use_local_model = False
+        self.training_examples = []
+
     def forward(self, hand: str, table_cards: str, position: str, pot_size: float,
                 stack_size: float, opponent_stack: float, game_type: str, opponent_tendency: str):
         # Create input dictionary
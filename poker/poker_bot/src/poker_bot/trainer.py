@@ -1,16 +1,28 @@
 import os
 import json
+import math
 import time
 import numpy as np
 from colorama import Fore, Style
 from tqdm import tqdm
 import random
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from poker_bot.poker_agent import PokerAgent
-from poker_bot.hyperparameter_tuner import HyperparameterTuner
 import dspy
 from dspy.evaluate import Evaluate
 from typing import List, Dict, Tuple
 
+# Game state fields passed to PokerAgent.forward, in its positional argument order
+GAME_FIELDS = (
+    'hand', 'table_cards', 'position', 'pot_size', 'stack_size',
+    'opponent_stack', 'game_type', 'opponent_tendency'
+)
+get_game_fields = itemgetter(*GAME_FIELDS)
+
+# Upper bound on concurrent LLM requests per training batch
+MAX_INFERENCE_WORKERS = 16
+
 class TrainingConfig:
     """Configuration class for training parameters"""
     def __init__(self, **kwargs):
@@ -109,16 +121,7 @@ class PokerEvaluator(dspy.Evaluate):
         
         for game in eval_data:
             # Unpack game state to match agent's forward method
-            action, reasoning = model(
-                hand=game['hand'],
-                table_cards=game['table_cards'],
-                position=game['position'],
-                pot_size=game['pot_size'],
-                stack_size=game['stack_size'],
-                opponent_stack=game['opponent_stack'],
-                game_type=game['game_type'],
-                opponent_tendency=game['opponent_tendency']
-            )
+            action, reasoning = model(*get_game_fields(game))
             
             # Calculate various metrics
             results["win_rate"] += self.calculate_win_rate(action, game)
@@ -309,6 +312,8 @@ class PokerTrainer:
         self.agent = PokerAgent()
         self.save_dir = os.path.join(os.path.dirname(__file__), 'training_data')
         os.makedirs(self.save_dir, exist_ok=True)
+        # hyperparameter_tuner imports this module at load time, so defer the reverse import
+        from poker_bot.hyperparameter_tuner import HyperparameterTuner
         self.tuner = HyperparameterTuner()
         self.evaluator = PokerEvaluator()
         self.config = TrainingConfig()
@@ -515,28 +520,30 @@ class PokerTrainer:
         inputs = []
         targets = []
 
-        for i in tqdm(range(0, len(train_data), self.config.batch_size), desc="Training Batches"):
-            batch = train_data[i:i + self.config.batch_size]
+        # Split a (shuffled) index order into batches instead of slicing new lists per step.
+        # Plain indexing keeps this working for lists as well as ScenarioBatch columns.
+        order = np.random.permutation(len(train_data)) if self.config.shuffle_data else np.arange(len(train_data))
+        n_batches = max(1, math.ceil(len(train_data) / self.config.batch_size))
 
-            for game_state in batch:
-                # Create a unique key for the game state
-                state_key = json.dumps(game_state, sort_keys=True)
+        for batch_idx in tqdm(np.array_split(order, n_batches), desc="Training Batches"):
+            batch = [train_data[i] for i in batch_idx]
+            state_keys = [json.dumps(game_state, sort_keys=True) for game_state in batch]
 
-                if state_key in self.response_cache:
-                    prediction = self.response_cache[state_key]
-                else:
-                    # Query the LLM and cache the response
-                    prediction = self.agent(
-                        hand=game_state['hand'],
-                        table_cards=game_state['table_cards'],
-                        position=game_state['position'],
-                        pot_size=game_state['pot_size'],
-                        stack_size=game_state['stack_size'],
-                        opponent_stack=game_state['opponent_stack'],
-                        game_type=game_state['game_type'],
-                        opponent_tendency=game_state['opponent_tendency']
-                    )
-                    self.response_cache[state_key] = prediction
+            # Query the LLM concurrently for every state not already cached
+            pending = {
+                state_key: game_state
+                for state_key, game_state in zip(state_keys, batch)
+                if state_key not in self.response_cache
+            }
+            if pending:
+                # Pool threads don't inherit the caller's dspy.context, so hand them the active LM
+                lm = dspy.settings.lm
+                with ThreadPoolExecutor(max_workers=min(len(pending), MAX_INFERENCE_WORKERS)) as executor:
+                    predictions = executor.map(lambda game_state: self._query_agent(game_state, lm), pending.values())
+                    self.response_cache.update(zip(pending, predictions))
+
+            for state_key, game_state in zip(state_keys, batch):
+                prediction = self.response_cache[state_key]
 
                 # Prepare data for local model training
                 inputs.append(game_state)
@@ -562,6 +569,11 @@ class PokerTrainer:
             total_metrics[metric] /= (num_batches * self.config.batch_size)
 
         return total_metrics
+
+    def _query_agent(self, game_state, lm):
+        """Run the agent on a single game state using the given LM"""
+        with dspy.context(lm=lm):
+            return self.agent(*get_game_fields(game_state))
     
     def _convert_to_treys_format(self, card_str):
         """Convert card string to Treys format"""
@@ -11,10 +11,10 @@ setup(
         "pytest",  # For testing
         "dspy-ai[all]",   # For DSPy functionality with all dependencies
         "scikit-learn",  # For machine learning functionality
+        "joblib>=1.3",  # For parallel hyperparameter evaluation
         "colorama",  # For colored terminal output
         "matplotlib",  # For plotting and visualization
         "openai",  # For OpenAI API integration
-        "seaborn",  # For statistical visualization
         "tqdm"  # For progress bars
     ],
     python_requires=">=3.8",
@@ -24,7 +24,7 @@ check_requirements() {
     pip install --upgrade pip wheel setuptools >/dev/null 2>&1
     
     # Install packages in one command to reduce overhead
-    pip install numpy pandas treys pytest "dspy-ai[all]" scikit-learn colorama matplotlib seaborn openai >/dev/null 2>&1
+    pip install numpy pandas treys pytest "dspy-ai[all]" scikit-learn colorama matplotlib openai >/dev/null 2>&1
     
     # Set PYTHONPATH
     export PYTHONPATH="${PYTHONPATH}:/workspaces/agentic-desktop/poker/poker_bot/src"